@@ -1,62 +1,220 @@
 from typing import Any, List, Dict, Optional
 import asyncio
-import json
+import logging
+import orjson
 import os
+import re
+import sys
 from datetime import datetime
 from fastmcp import FastMCP
-import requests
-from bs4 import BeautifulSoup
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import html, etree
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter, before_sleep_log
 import time
 from functools import wraps
+from contextlib import asynccontextmanager
+from urllib.parse import quote
+
+logger = logging.getLogger("movie_mcp")
+
+@asynccontextmanager
+async def lifespan(server):
+    """服务器生命周期：退出时在同一个事件循环中关闭HTTP客户端，下次使用时重新创建"""
+    global CLIENT
+    try:
+        yield
+    finally:
+        if CLIENT is not None:
+            await CLIENT.aclose()
+            CLIENT = None
 
 # 初始化 FastMCP 服务器
-mcp = FastMCP("movie_mcp")
+mcp = FastMCP("movie_mcp", lifespan=lifespan)
 
 # 全局变量
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
-TIMESTAMP = datetime.now().strftime("%Y%m%d_%H%M%S")
 
 # 确保目录存在
 os.makedirs(DATA_DIR, exist_ok=True)
 
 # 常量定义
-DOUBAN_API = "https://movie.douban.com/j/subject_suggest?q={keyword}"
-DOUBAN_DETAIL = "https://movie.douban.com/subject/{id}/"
-DOUBAN_COMMENTS = "https://movie.douban.com/subject/{id}/comments"
+DOUBAN_BASE = "https://movie.douban.com"
 MAX_RETRIES = 3
-RETRY_DELAY = 2
+CACHE_TTL = 3600
+CACHE_MAXSIZE = 1024
+MAX_CONCURRENT_REQUESTS = 8
+
+# 基本信息中的 "键: 值" 行
+_INFO_RE = re.compile(r"^[^\S\n]*([^\s:][^:\n]*?)[^\S\n]*:[^\S\n]*(.*\S)", re.M)
+
+# 复用的HTML解析器，丢弃用不到的注释和处理指令
+_PARSER = html.HTMLParser(recover=True, remove_comments=True, remove_pis=True, encoding="utf-8")
+
+# 电影详情页的预编译XPath
+_XP_TITLE = etree.XPath("string((//h1//span)[1])")
+_XP_RATING = etree.XPath("string((//*[contains(concat(' ', normalize-space(@class), ' '), ' rating_num ')])[1])")
+_XP_VOTES = etree.XPath("string((//*[contains(concat(' ', normalize-space(@class), ' '), ' rating_people ')]//span)[1])")
+_XP_INFO = etree.XPath("string(//*[@id='info'])")
+_XP_GENRES = etree.XPath("//span[@property='v:genre']/text()")
+_XP_SUMMARY = etree.XPath("(//*[@property='v:summary'])[1]//text()")
+_XP_POSTER = etree.XPath("string((//*[@id='mainpic']//img)[1]/@src)")
+_XP_RECS = etree.XPath("//*[contains(concat(' ', normalize-space(@class), ' '), ' recommendations-bd ')]//dl")
+_XP_REC_LINK = etree.XPath("(.//a)[1]")
+_XP_REC_RATING = etree.XPath("(.//*[contains(concat(' ', normalize-space(@class), ' '), ' rating_nums ')])[1]")
+
+# 只解析评论所在的区域
+_COMMENTS_STRAINER = SoupStrainer(class_="comment-item")
+
+# 共享的异步HTTP客户端，通过 HTTP/2 多路复用同一个连接，首次使用时创建
+CLIENT: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """获取共享的HTTP客户端，不存在或已关闭时重新创建"""
+    global CLIENT
+    if CLIENT is None or CLIENT.is_closed:
+        CLIENT = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            headers={"User-Agent": "Mozilla/5.0"},
+            timeout=10,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        )
+    return CLIENT
+
+def is_transient_error(e: BaseException) -> bool:
+    """判断是否为可重试的临时错误（网络错误、超时、429 和 5xx）"""
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code == 429 or e.response.status_code >= 500
+    return isinstance(e, httpx.TransportError)
+
+# 电影类型对应的主题
+_GENRE_THEMES = {k: frozenset(v) for k, v in {
+    '剧情': ['故事性', '人物塑造', '情节发展'],
+    '喜剧': ['幽默感', '笑点', '欢乐氛围'],
+    '动作': ['动作场面', '视觉效果', '刺激感'],
+    '爱情': ['感情线', '浪漫元素', '人物关系'],
+    '科幻': ['科技元素', '未来世界', '想象力'],
+    '动画': ['动画效果', '角色设计', '视觉风格'],
+    '悬疑': ['推理元素', '剧情转折', '悬念设置'],
+    '惊悚': ['紧张氛围', '恐怖元素', '心理描写'],
+    '恐怖': ['恐怖氛围', '惊吓元素', '心理恐惧'],
+    '犯罪': ['犯罪元素', '社会问题', '人性探讨'],
+    '奇幻': ['奇幻元素', '想象力', '世界观'],
+    '冒险': ['冒险元素', '探索精神', '刺激感'],
+    '灾难': ['灾难场景', '人性考验', '生存主题'],
+    '音乐': ['音乐元素', '艺术表现', '情感表达'],
+    '历史': ['历史背景', '时代特征', '文化内涵'],
+    '战争': ['战争场面', '历史背景', '人性探讨'],
+    '传记': ['人物生平', '历史背景', '人物塑造'],
+    '运动': ['体育精神', '竞技元素', '团队合作'],
+    '纪录片': ['真实记录', '社会观察', '知识普及']
+}.items()}
+
+# 进程内缓存: key -> (过期时间, 任务)
+# 缓存的是任务本身，进行中的请求会被并发调用方共享
+_CACHE: Dict[str, tuple] = {}
 
-def retry_on_failure(max_retries=MAX_RETRIES, delay=RETRY_DELAY):
-    """重试装饰器"""
+def cached(key, ttl=CACHE_TTL):
+    """TTL缓存装饰器，key 为根据调用参数生成缓存键的函数"""
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
-            for i in range(max_retries):
-                try:
-                    return await func(*args, **kwargs)
-                except Exception as e:
-                    if i == max_retries - 1:
-                        raise e
-                    print(f"尝试 {i+1}/{max_retries} 失败: {str(e)}")
-                    await asyncio.sleep(delay)
-            return None
+            cache_key = key(*args, **kwargs)
+            hit = _CACHE.get(cache_key)
+            if hit and (not hit[1].done() or hit[0] > time.monotonic()):
+                return await asyncio.shield(hit[1])
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            
+            def evict_on_error(t):
+                # 失败的结果不缓存
+                if (t.cancelled() or t.exception() is not None) and _CACHE.get(cache_key, (None, None))[1] is t:
+                    del _CACHE[cache_key]
+            task.add_done_callback(evict_on_error)
+            
+            if cache_key not in _CACHE and len(_CACHE) >= CACHE_MAXSIZE:
+                _CACHE.pop(next(iter(_CACHE)))
+            _CACHE[cache_key] = (time.monotonic() + ttl, task)
+            return await asyncio.shield(task)
         return wrapper
     return decorator
 
-def save_to_json(data: dict, filename: str):
-    """保存数据到JSON文件"""
+# 限制对豆瓣的并发请求数，避免触发 403
+_DOUBAN_SEM = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# 后台任务引用，防止未完成的任务被回收
+_BACKGROUND_TASKS = set()
+
+@retry(
+    stop=stop_after_attempt(MAX_RETRIES),
+    wait=wait_exponential_jitter(1, 8),
+    retry=retry_if_exception(is_transient_error),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+async def fetch(url: str) -> httpx.Response:
+    """异步请求页面"""
+    async with _DOUBAN_SEM:
+        resp = await get_client().get(url)
+    resp.raise_for_status()
+    return resp
+
+async def _prefetch_detail(douban_id: str):
+    """预取电影详情到缓存，失败时忽略"""
+    try:
+        await _get_detail_info(douban_id)
+    except Exception as e:
+        logger.debug("预取电影详情出错: %s", e)
+
+def prefetch_details(douban_ids: List[str]):
+    """在后台并发预取多部电影的详情"""
+    for douban_id in douban_ids:
+        task = asyncio.create_task(_prefetch_detail(douban_id))
+        _BACKGROUND_TASKS.add(task)
+        task.add_done_callback(_BACKGROUND_TASKS.discard)
+
+def _save_json_sync(data: dict, filename: str):
+    """同步保存数据到JSON文件"""
     filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    with open(filepath, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
 
-def load_from_json(filename: str) -> dict:
-    """从JSON文件加载数据"""
+def _load_json_sync(filename: str) -> dict:
+    """同步从JSON文件加载数据"""
     filepath = os.path.join(DATA_DIR, filename)
     if os.path.exists(filepath):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
     return {}
 
+async def save_to_json(data: dict, filename: str):
+    """保存数据到JSON文件（在线程中执行，不阻塞事件循环）"""
+    await asyncio.to_thread(_save_json_sync, data, filename)
+
+async def load_from_json(filename: str) -> dict:
+    """从JSON文件加载数据（在线程中执行，不阻塞事件循环）"""
+    return await asyncio.to_thread(_load_json_sync, filename)
+
+@cached(key=lambda keyword, limit=5: f"search:{keyword}:{limit}")
+async def _search(keyword: str, limit: int = 5) -> List[dict]:
+    """搜索电影，返回结构化结果"""
+    logger.debug("开始搜索电影: %s", keyword)
+    resp = await fetch(f"{DOUBAN_BASE}/j/subject_suggest?q={quote(keyword)}")
+    
+    results = []
+    data = orjson.loads(resp.content)
+    logger.debug("获取到搜索结果: %s", data)
+    
+    for item in data[:limit]:
+        results.append({
+            "title": item["title"],
+            "year": item.get("year", ""),
+            "douban_id": item["id"],
+            "subtitle": item.get("sub_title", ""),
+            "type": item.get("type", "movie")
+        })
+    return results
+
 @mcp.tool()
 async def search_movies(keyword: str, limit: int = 5) -> str:
     """搜索电影信息
@@ -66,43 +224,78 @@ async def search_movies(keyword: str, limit: int = 5) -> str:
         limit: 返回结果数量限制
     """
     try:
-        print(f"开始搜索电影: {keyword}")
-        resp = requests.get(
-            DOUBAN_API.format(keyword=keyword),
-            headers={"User-Agent": "Mozilla/5.0"},
-            timeout=10
-        )
-        resp.raise_for_status()
-        
-        results = []
-        data = resp.json()
-        print(f"获取到搜索结果: {data}")
+        results = await _search(keyword, limit)
         
-        for item in data[:limit]:
-            results.append({
-                "title": item["title"],
-                "year": item.get("year", ""),
-                "douban_id": item["id"],
-                "subtitle": item.get("sub_title", ""),
-                "type": item.get("type", "movie")
-            })
+        # 用户通常会继续查看详情，提前放入缓存
+        prefetch_details([movie["douban_id"] for movie in results])
         
         # 格式化返回结果
         if results:
-            result = "搜索结果：\n\n"
+            parts = ["搜索结果：\n\n"]
             for i, movie in enumerate(results, 1):
-                result += f"{i}. {movie['title']} ({movie.get('year', '未知年份')})\n"
-                result += f"   ID: {movie['douban_id']}\n"
+                parts.append(f"{i}. {movie['title']} ({movie.get('year', '未知年份')})\n")
+                parts.append(f"   ID: {movie['douban_id']}\n")
                 if movie.get('subtitle'):
-                    result += f"   副标题: {movie['subtitle']}\n"
-                result += "\n"
-            return result
+                    parts.append(f"   副标题: {movie['subtitle']}\n")
+                parts.append("\n")
+            return "".join(parts)
         else:
             return f"未找到与\"{keyword}\"相关的电影"
     
     except Exception as e:
         return f"搜索电影时出错: {str(e)}"
 
+@cached(key=lambda douban_id: f"subject:{douban_id}")
+async def _get_subject(douban_id: str) -> dict:
+    """请求并解析一次电影详情页，同时提取详情和推荐电影"""
+    url = f"{DOUBAN_BASE}/subject/{quote(douban_id, safe='')}/"
+    resp = await fetch(url)
+    
+    tree = html.fromstring(resp.content, parser=_PARSER)
+    
+    info = {
+        "douban_id": douban_id,
+        "title": _XP_TITLE(tree).strip() or "未知标题",
+        "rating": _XP_RATING(tree).strip() or "无评分",
+        "votes": _XP_VOTES(tree).strip() or "0",
+    }
+    
+    # 获取基本信息
+    info.update(_INFO_RE.findall(_XP_INFO(tree)))
+    
+    # 获取类型信息
+    genres = [g.strip() for g in _XP_GENRES(tree)]
+    if genres:
+        info["类型"] = " / ".join(genres)
+    
+    # 获取简介
+    info["简介"] = "".join(t.strip() for t in _XP_SUMMARY(tree)) or "无简介"
+    
+    # 获取海报
+    info["海报链接"] = _XP_POSTER(tree) or None
+    
+    # 获取推荐电影列表
+    recommendations = []
+    for item in _XP_RECS(tree):
+        try:
+            link = _XP_REC_LINK(item)[0]
+            rating = _XP_REC_RATING(item)
+            
+            recommendations.append({
+                "title": link.text_content().strip(),
+                "douban_id": link.get("href").split("/")[-2],
+                "rating": rating[0].text_content().strip() if rating else "无评分"
+            })
+        except Exception as e:
+            logger.debug("解析推荐电影出错: %s", e)
+            continue
+    
+    return {"info": info, "recommendations": recommendations}
+
+async def _get_detail_info(douban_id: str) -> dict:
+    """获取电影详情，返回结构化信息"""
+    return (await _get_subject(douban_id))["info"]
+
 @mcp.tool()
 async def get_movie_detail(douban_id: str) -> str:
     """获取电影详细信息
@@ -111,56 +304,17 @@ async def get_movie_detail(douban_id: str) -> str:
         douban_id: 豆瓣电影ID
     """
     try:
-        url = DOUBAN_DETAIL.format(id=douban_id)
-        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        info = {
-            "douban_id": douban_id,
-            "title": soup.select_one("h1 span").get_text(strip=True) if soup.select_one("h1 span") else "未知标题",
-            "rating": soup.select_one(".rating_num").get_text(strip=True) if soup.select_one(".rating_num") else "无评分",
-            "votes": soup.select_one(".rating_people span").get_text(strip=True) if soup.select_one(".rating_people span") else "0",
-        }
-        
-        # 获取基本信息
-        info_section = soup.find(id="info")
-        if info_section:
-            for item in info_section.get_text().split("\n"):
-                item = item.strip()
-                if ":" in item:
-                    key, value = item.split(":", 1)
-                    key = key.strip()
-                    value = value.strip()
-                    if key and value:
-                        info[key] = value
-        
-        # 获取类型信息
-        genres = soup.find_all("span", property="v:genre")
-        if genres:
-            info["类型"] = " / ".join([g.get_text(strip=True) for g in genres])
-        
-        # 获取简介
-        summary = soup.find(property="v:summary")
-        if summary:
-            info["简介"] = summary.get_text(strip=True)
-        else:
-            info["简介"] = "无简介"
-        
-        # 获取海报
-        poster = soup.select_one("#mainpic img")
-        info["海报链接"] = poster["src"] if poster else None
+        info = await _get_detail_info(douban_id)
         
         # 格式化返回结果
-        result = f"电影详情：\n\n"
-        result += f"标题: {info['title']}\n"
-        result += f"评分: {info['rating']} ({info['votes']}人评价)\n"
+        parts = ["电影详情：\n\n"]
+        parts.append(f"标题: {info['title']}\n")
+        parts.append(f"评分: {info['rating']} ({info['votes']}人评价)\n")
         for key, value in info.items():
             if key not in ['title', 'rating', 'votes', 'douban_id']:
-                result += f"{key}: {value}\n"
+                parts.append(f"{key}: {value}\n")
         
-        return result
+        return "".join(parts)
     
     except Exception as e:
         return f"获取电影详情时出错: {str(e)}"
@@ -174,60 +328,56 @@ async def analyze_movie(douban_id: str) -> dict:
     """
     try:
         # 获取电影详情
-        detail_result = await get_movie_detail(douban_id)
-        
-        # 解析获取到的电影信息
-        info = {}
-        for line in detail_result.split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                info[key.strip()] = value.strip()
+        info = await _get_detail_info(douban_id)
         
         # 分析电影类型和主题
         genres = info.get('类型', '').split(' / ')
-        themes = []
-        
-        # 根据类型推断主题
-        genre_themes = {
-            '剧情': ['故事性', '人物塑造', '情节发展'],
-            '喜剧': ['幽默感', '笑点', '欢乐氛围'],
-            '动作': ['动作场面', '视觉效果', '刺激感'],
-            '爱情': ['感情线', '浪漫元素', '人物关系'],
-            '科幻': ['科技元素', '未来世界', '想象力'],
-            '动画': ['动画效果', '角色设计', '视觉风格'],
-            '悬疑': ['推理元素', '剧情转折', '悬念设置'],
-            '惊悚': ['紧张氛围', '恐怖元素', '心理描写'],
-            '恐怖': ['恐怖氛围', '惊吓元素', '心理恐惧'],
-            '犯罪': ['犯罪元素', '社会问题', '人性探讨'],
-            '奇幻': ['奇幻元素', '想象力', '世界观'],
-            '冒险': ['冒险元素', '探索精神', '刺激感'],
-            '灾难': ['灾难场景', '人性考验', '生存主题'],
-            '音乐': ['音乐元素', '艺术表现', '情感表达'],
-            '历史': ['历史背景', '时代特征', '文化内涵'],
-            '战争': ['战争场面', '历史背景', '人性探讨'],
-            '传记': ['人物生平', '历史背景', '人物塑造'],
-            '运动': ['体育精神', '竞技元素', '团队合作'],
-            '纪录片': ['真实记录', '社会观察', '知识普及']
-        }
-        
-        for genre in genres:
-            if genre in genre_themes:
-                themes.extend(genre_themes[genre])
+        themes = sorted(set().union(*(_GENRE_THEMES.get(g, ()) for g in genres)))
         
         # 返回分析结果
         return {
             "douban_id": douban_id,
             "基本信息": info,
             "类型": genres,
-            "主题": list(set(themes)),  # 去重
-            "评分": info.get('评分', '无评分'),
-            "评价人数": info.get('评价人数', '0'),
+            "主题": themes,
+            "评分": info['rating'],
+            "评价人数": info['votes'],
             "message": "请根据电影信息生成一条专业的影评，注意以下要点：\n1. 分析电影的类型特点和主题表现\n2. 评价演员表演和导演手法\n3. 讨论电影的社会意义和艺术价值\n4. 给出客观的评分建议"
         }
     
     except Exception as e:
         return {"error": f"分析电影信息时出错: {str(e)}"}
 
+@cached(key=lambda douban_id, limit=5: f"comments:{douban_id}:{limit}")
+async def _get_comments(douban_id: str, limit: int = 5) -> List[dict]:
+    """获取电影评论，返回结构化结果"""
+    url = f"{DOUBAN_BASE}/subject/{quote(douban_id, safe='')}/comments"
+    resp = await fetch(url)
+    
+    soup = BeautifulSoup(resp.content, "lxml", parse_only=_COMMENTS_STRAINER)
+    comments = []
+    
+    # 获取评论列表，只遍历前 limit 条
+    for item in soup.find_all(class_="comment-item", limit=limit):
+        try:
+            author = item.select_one(".comment-info a")
+            content = item.select_one(".comment-content")
+            comment_time = item.select_one(".comment-time")
+            if not author or not content or not comment_time:
+                continue
+            rating = item.select_one(".rating")
+            
+            comments.append({
+                "作者": author.get_text(strip=True),
+                "评分": rating["class"][0][-2] if rating else "无评分",
+                "内容": content.get_text(strip=True),
+                "时间": comment_time.get_text(strip=True)
+            })
+        except Exception as e:
+            logger.debug("解析评论出错: %s", e)
+            continue
+    return comments
+
 @mcp.tool()
 async def get_movie_comments(douban_id: str, limit: int = 5) -> str:
     """获取电影评论
@@ -237,47 +387,26 @@ async def get_movie_comments(douban_id: str, limit: int = 5) -> str:
         limit: 返回评论数量限制
     """
     try:
-        url = DOUBAN_COMMENTS.format(id=douban_id)
-        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        comments = []
-        
-        # 获取评论列表
-        comment_items = soup.select(".comment-item")
-        for item in comment_items[:limit]:
-            try:
-                author = item.select_one(".comment-info a").get_text(strip=True)
-                rating = item.select_one(".rating")
-                rating = rating["class"][0][-2] if rating else "无评分"
-                content = item.select_one(".comment-content").get_text(strip=True)
-                time = item.select_one(".comment-time").get_text(strip=True)
-                
-                comments.append({
-                    "作者": author,
-                    "评分": rating,
-                    "内容": content,
-                    "时间": time
-                })
-            except Exception as e:
-                print(f"解析评论出错: {str(e)}")
-                continue
+        comments = await _get_comments(douban_id, limit)
         
         # 格式化返回结果
         if comments:
-            result = f"电影评论：\n\n"
+            parts = ["电影评论：\n\n"]
             for i, comment in enumerate(comments, 1):
-                result += f"{i}. {comment['作者']} (评分: {comment['评分']})\n"
-                result += f"   时间: {comment['时间']}\n"
-                result += f"   内容: {comment['内容']}\n\n"
-            return result
+                parts.append(f"{i}. {comment['作者']} (评分: {comment['评分']})\n")
+                parts.append(f"   时间: {comment['时间']}\n")
+                parts.append(f"   内容: {comment['内容']}\n\n")
+            return "".join(parts)
         else:
             return "未找到任何评论"
     
     except Exception as e:
         return f"获取电影评论时出错: {str(e)}"
 
+async def _get_recommendations(douban_id: str, limit: int = 5) -> List[dict]:
+    """获取推荐电影，返回结构化结果"""
+    return (await _get_subject(douban_id))["recommendations"][:limit]
+
 @mcp.tool()
 async def get_movie_recommendations(douban_id: str, limit: int = 5) -> str:
     """获取电影推荐
@@ -287,40 +416,16 @@ async def get_movie_recommendations(douban_id: str, limit: int = 5) -> str:
         limit: 返回推荐数量限制
     """
     try:
-        url = DOUBAN_DETAIL.format(id=douban_id)
-        resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        recommendations = []
-        
-        # 获取推荐电影列表
-        rec_items = soup.select(".recommendations-bd dl")
-        for item in rec_items[:limit]:
-            try:
-                title = item.select_one("a").get_text(strip=True)
-                link = item.select_one("a")["href"]
-                rec_id = link.split("/")[-2]
-                rating = item.select_one(".rating_nums")
-                rating = rating.get_text(strip=True) if rating else "无评分"
-                
-                recommendations.append({
-                    "title": title,
-                    "douban_id": rec_id,
-                    "rating": rating
-                })
-            except Exception as e:
-                print(f"解析推荐电影出错: {str(e)}")
-                continue
+        recommendations = await _get_recommendations(douban_id, limit)
         
         # 格式化返回结果
         if recommendations:
-            result = f"推荐电影：\n\n"
+            parts = ["推荐电影：\n\n"]
             for i, movie in enumerate(recommendations, 1):
-                result += f"{i}. {movie['title']}\n"
-                result += f"   评分: {movie['rating']}\n"
-                result += f"   ID: {movie['douban_id']}\n\n"
-            return result
+                parts.append(f"{i}. {movie['title']}\n")
+                parts.append(f"   评分: {movie['rating']}\n")
+                parts.append(f"   ID: {movie['douban_id']}\n\n")
+            return "".join(parts)
         else:
             return "未找到任何推荐电影"
     
@@ -335,33 +440,34 @@ async def save_movie_info(douban_id: str) -> str:
         douban_id: 豆瓣电影ID
     """
     try:
-        # 获取电影详情
-        detail_result = await get_movie_detail(douban_id)
-        
-        # 解析电影信息
-        info = {}
-        for line in detail_result.split('\n'):
-            if ':' in line:
-                key, value = line.split(':', 1)
-                info[key.strip()] = value.strip()
-        
-        # 获取评论
-        comments_result = await get_movie_comments(douban_id)
+        # 并发获取详情、评论和推荐，详情和推荐共用同一次页面请求
+        info, comments, recommendations = await asyncio.gather(
+            _get_detail_info(douban_id),
+            _get_comments(douban_id),
+            _get_recommendations(douban_id),
+            return_exceptions=True,
+        )
         
-        # 获取推荐
-        recommendations_result = await get_movie_recommendations(douban_id)
+        # 某一部分失败时仍保存其余内容，失败部分记录错误信息
+        if isinstance(info, Exception):
+            info = f"获取电影详情时出错: {str(info)}"
+        if isinstance(comments, Exception):
+            comments = f"获取电影评论时出错: {str(comments)}"
+        if isinstance(recommendations, Exception):
+            recommendations = f"获取电影推荐时出错: {str(recommendations)}"
         
         # 整合所有信息
+        saved_at = datetime.now()
         movie_data = {
             "基本信息": info,
-            "评论": comments_result,
-            "推荐": recommendations_result,
-            "保存时间": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            "评论": comments,
+            "推荐": recommendations,
+            "保存时间": saved_at
         }
         
         # 保存到文件
-        filename = f"movie_{douban_id}_{TIMESTAMP}.json"
-        save_to_json(movie_data, filename)
+        filename = f"movie_{douban_id}_{saved_at.strftime('%Y%m%d_%H%M%S')}.json"
+        await save_to_json(movie_data, filename)
         
         return f"电影信息已保存到文件: {filename}"
     
@@ -369,7 +475,10 @@ async def save_movie_info(douban_id: str) -> str:
         return f"保存电影信息时出错: {str(e)}"
 
 if __name__ == "__main__":
+    # stdio 传输占用 stdout 作为协议通道，日志只能输出到 stderr
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    
     # 初始化并运行服务器
-    print("启动电影查询MCP服务器...")
-    print("请在MCP客户端（如Claude for Desktop）中配置此服务器")
+    logger.info("启动电影查询MCP服务器...")
+    logger.info("请在MCP客户端（如Claude for Desktop）中配置此服务器")
     mcp.run(transport='stdio') 
\ No newline at end of file
@@ -1,32 +1,40 @@
 import asyncio
+import os
+import re
+import sys
+import orjson
 import requests
 from bs4 import BeautifulSoup
 import time
 import logging
+import threading
+from urllib.parse import quote
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # 常量定义
-DOUBAN_API = "https://movie.douban.com/j/subject_suggest?q={keyword}"
-DOUBAN_DETAIL = "https://movie.douban.com/subject/{id}/"
-IMDB_SEARCH = "https://www.imdb.com/find?q={keyword}&s=tt"
+DOUBAN_BASE = "https://movie.douban.com"
+IMDB_BASE = "https://www.imdb.com"
+
+# 基本信息中的 "键: 值" 行
+_INFO_RE = re.compile(r"^[^\S\n]*([^\s:][^:\n]*?)[^\S\n]*:[^\S\n]*(.*\S)", re.M)
 
 async def search_movies(keyword: str, limit: int = 5):
     """搜索电影信息"""
     try:
         logger.info(f"开始搜索电影: {keyword}")
         resp = requests.get(
-            DOUBAN_API.format(keyword=keyword),
+            f"{DOUBAN_BASE}/j/subject_suggest?q={quote(keyword)}",
             headers={"User-Agent": "Mozilla/5.0"},
             timeout=10
         )
         resp.raise_for_status()
         
         results = []
-        data = resp.json()
-        logger.info(f"获取到搜索结果: {data}")
+        data = orjson.loads(resp.content)
+        logger.debug("获取到搜索结果: %s", data)
         
         for item in data[:limit]:
             results.append({
@@ -44,31 +52,27 @@ async def search_movies(keyword: str, limit: int = 5):
 async def get_movie_detail(douban_id: str):
     """获取电影详细信息"""
     try:
-        url = DOUBAN_DETAIL.format(id=douban_id)
+        url = f"{DOUBAN_BASE}/subject/{quote(douban_id, safe='')}/"
         resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
         resp.raise_for_status()
         
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = BeautifulSoup(resp.content, "lxml")
         
+        title = soup.select_one("h1 span")
+        rating = soup.select_one(".rating_num")
+        votes = soup.select_one(".rating_people span")
         info = {
             "douban_id": douban_id,
-            "title": soup.select_one("h1 span").get_text(strip=True) if soup.select_one("h1 span") else "未知标题",
-            "rating": soup.select_one(".rating_num").get_text(strip=True) if soup.select_one(".rating_num") else "无评分",
-            "votes": soup.select_one(".rating_people span").get_text(strip=True) if soup.select_one(".rating_people span") else "0",
+            "title": title.get_text(strip=True) if title else "未知标题",
+            "rating": rating.get_text(strip=True) if rating else "无评分",
+            "votes": votes.get_text(strip=True) if votes else "0",
         }
         
         # 获取基本信息
         info_section = soup.find(id="info")
         if info_section:
             # 获取所有基本信息项
-            for item in info_section.get_text().split("\n"):
-                item = item.strip()
-                if ":" in item:
-                    key, value = item.split(":", 1)
-                    key = key.strip()
-                    value = value.strip()
-                    if key and value:
-                        info[key] = value
+            info.update(_INFO_RE.findall(info_section.get_text()))
             
             # 特殊处理导演、编剧、主演（因为这些可能有多个值）
             for role in ["导演", "编剧", "主演"]:
@@ -140,11 +144,11 @@ async def analyze_rating(rating: str):
 async def recommend_similar(title: str, limit: int = 5):
     """推荐相似电影"""
     try:
-        url = IMDB_SEARCH.format(keyword=title)
+        url = f"{IMDB_BASE}/find?q={quote(title)}&s=tt"
         resp = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=10)
         resp.raise_for_status()
         
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = BeautifulSoup(resp.content, "lxml")
         
         results = []
         similar_section = soup.find("section", {"data-testid": "find-more-like-this"})
@@ -154,7 +158,7 @@ async def recommend_similar(title: str, limit: int = 5):
                 if title_tag:
                     results.append({
                         "title": title_tag.get_text(strip=True),
-                        "url": "https://www.imdb.com" + title_tag["href"],
+                        "url": IMDB_BASE + title_tag["href"],
                         "source": "IMDB"
                     })
         return results
@@ -162,88 +166,129 @@ async def recommend_similar(title: str, limit: int = 5):
         logger.error(f"获取相似电影时出错: {e}")
         return []
 
+async def ainput(prompt: str = "") -> str:
+    """在守护线程中读取用户输入，避免阻塞事件循环
+
+    不使用默认线程池，否则 Ctrl-C 时 asyncio.run 会一直等待阻塞在 input() 上的线程
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def set_result(value=None, error=None):
+        if not future.done():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(value)
+
+    def read():
+        try:
+            value = input(prompt)
+        except Exception as e:
+            error = e
+            value = None
+        else:
+            error = None
+        try:
+            loop.call_soon_threadsafe(set_result, value, error)
+        except RuntimeError:
+            # 事件循环已关闭
+            pass
+
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
 async def main():
     print("欢迎使用电影信息查询系统！")
     
-    while True:
-        print("\n=== 电影信息查询系统 ===")
-        print("1. 搜索电影")
-        print("2. 获取电影详情")
-        print("3. 分析评分")
-        print("4. 推荐相似电影")
-        print("0. 退出")
-        print("=====================")
-        2
-        
-        choice = input("请选择功能 (0-4): ")
-        
-        if choice == "0":
-            print("感谢使用，再见！")
-            break
+    try:
+        while True:
+            print("\n=== 电影信息查询系统 ===")
+            print("1. 搜索电影")
+            print("2. 获取电影详情")
+            print("3. 分析评分")
+            print("4. 推荐相似电影")
+            print("0. 退出")
+            print("=====================")
             
-        elif choice == "1":
-            keyword = input("请输入要搜索的电影名称: ")
-            print("\n搜索中...")
-            try:
-                results = await search_movies(keyword)
-                if results:
-                    print("\n搜索结果:")
-                    for movie in results:
-                        print(f"- {movie['title']} ({movie.get('year', '未知年份')})")
-                        print(f"  ID: {movie['douban_id']}")
-                        if movie.get('subtitle'):
-                            print(f"  副标题: {movie['subtitle']}")
-                        print()
-                else:
-                    print("未找到相关电影")
-            except Exception as e:
-                print(f"搜索出错: {e}")
+            choice = await ainput("请选择功能 (0-4): ")
             
-        elif choice == "2":
-            movie_id = input("请输入豆瓣电影ID: ")
-            print("\n获取详情中...")
-            try:
-                details = await get_movie_detail(movie_id)
-                if details and "error" not in details:
-                    print("\n电影详情:")
-                    for key, value in details.items():
+            if choice == "0":
+                print("感谢使用，再见！")
+                break
+                
+            elif choice == "1":
+                keyword = await ainput("请输入要搜索的电影名称: ")
+                print("\n搜索中...")
+                try:
+                    results = await search_movies(keyword)
+                    if results:
+                        print("\n搜索结果:")
+                        for movie in results:
+                            print(f"- {movie['title']} ({movie.get('year', '未知年份')})")
+                            print(f"  ID: {movie['douban_id']}")
+                            if movie.get('subtitle'):
+                                print(f"  副标题: {movie['subtitle']}")
+                            print()
+                    else:
+                        print("未找到相关电影")
+                except Exception as e:
+                    print(f"搜索出错: {e}")
+                
+            elif choice == "2":
+                movie_id = await ainput("请输入豆瓣电影ID: ")
+                print("\n获取详情中...")
+                try:
+                    details = await get_movie_detail(movie_id)
+                    if details and "error" not in details:
+                        print("\n电影详情:")
+                        for key, value in details.items():
+                            print(f"{key}: {value}")
+                    else:
+                        print("获取电影详情失败")
+                except Exception as e:
+                    print(f"获取详情出错: {e}")
+                
+            elif choice == "3":
+                rating = await ainput("请输入评分 (0-10): ")
+                print("\n分析评分中...")
+                try:
+                    analysis = await analyze_rating(rating)
+                    print("\n评分分析:")
+                    for key, value in analysis.items():
                         print(f"{key}: {value}")
-                else:
-                    print("获取电影详情失败")
-            except Exception as e:
-                print(f"获取详情出错: {e}")
-            
-        elif choice == "3":
-            rating = input("请输入评分 (0-10): ")
-            print("\n分析评分中...")
-            try:
-                analysis = await analyze_rating(rating)
-                print("\n评分分析:")
-                for key, value in analysis.items():
-                    print(f"{key}: {value}")
-            except Exception as e:
-                print(f"分析评分出错: {e}")
-            
-        elif choice == "4":
-            title = input("请输入电影名称: ")
-            print("\n获取推荐中...")
-            try:
-                similar = await recommend_similar(title)
-                if similar:
-                    print("\n相似电影:")
-                    for movie in similar:
-                        print(f"- {movie['title']}")
-                        print(f"  链接: {movie['url']}")
-                        print()
-                else:
-                    print("未找到相似电影")
-            except Exception as e:
-                print(f"获取推荐出错: {e}")
+                except Exception as e:
+                    print(f"分析评分出错: {e}")
+                
+            elif choice == "4":
+                title = await ainput("请输入电影名称: ")
+                print("\n获取推荐中...")
+                try:
+                    similar = await recommend_similar(title)
+                    if similar:
+                        print("\n相似电影:")
+                        for movie in similar:
+                            print(f"- {movie['title']}")
+                            print(f"  链接: {movie['url']}")
+                            print()
+                    else:
+                        print("未找到相似电影")
+                except Exception as e:
+                    print(f"获取推荐出错: {e}")
+                
+            else:
+                print("无效的选择，请重试")
             
-        else:
-            print("无效的选择，请重试")
-        
-        input("\n按回车键继续...")
+            await ainput("\n按回车键继续...")
+    except EOFError:
+        # 输入流结束（如 Ctrl-D）时直接退出
+        print("\n感谢使用，再见！")
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("\n感谢使用，再见！")
+        # 读取输入的守护线程可能仍持有 stdin 的锁，跳过解释器清理直接退出
+        sys.stdout.flush()
+        os._exit(130) 
\ No newline at end of file